@@ -0,0 +1,88 @@
+"""
+Async HTTP load generator for the domain endpoints
+Targets the in-process ASGI app by default, or a running server with --url
+
+    python -m benchmarks.load --requests 50 --concurrency 8 --output load.json
+    python -m benchmarks.load --url http://localhost:8000 --scenarios robot_arm_batch
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import httpx
+import numpy as np
+from . import workloads
+from .micro import environment
+
+async def run_scenario(client:httpx.AsyncClient, scenario:str, requests:int, concurrency:int) -> dict:
+    method, path, payload = workloads.HTTP[scenario]
+    options = {"json": payload} if method == "POST" else {"params": payload}
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **options)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "throughput": requests / elapsed,
+        "latency": {"p50": p50, "p95": p95, "p99": p99, "mean": float(np.mean(latencies)), "max": max(latencies)},
+        "statuses": statuses,
+    }
+
+async def run(scenarios:list, requests:int, concurrency:int, url:str = None, timeout:float = 300) -> dict:
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=timeout)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=timeout)
+    results = {}
+    async with client:
+        for scenario in scenarios:
+            # one unmeasured request so lazy domain imports are not counted
+            method, path, payload = workloads.HTTP[scenario]
+            await client.request(method, path, **({"json": payload} if method == "POST" else {"params": payload}))
+            results[scenario] = await run_scenario(client, scenario, requests, concurrency)
+            summary = results[scenario]
+            print(f"{scenario}: {summary['throughput']:.2f} req/s, p95 {summary['latency']['p95'] * 1000:.1f} ms",
+                  file=sys.stderr)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server, defaults to the in-process app")
+    parser.add_argument("--scenarios", nargs="+", choices=list(workloads.HTTP), default=list(workloads.HTTP))
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.scenarios, args.requests, args.concurrency, args.url))
+    report = json.dumps({
+        "environment": dict(environment(), target=args.url or "asgi"),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f: f.write(report)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
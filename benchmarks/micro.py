@@ -0,0 +1,157 @@
+"""
+Micro-benchmarks of the core algorithm of each domain on the fixed workloads in workloads.py
+Rendering is excluded except for the "render" group, which times one GIF per domain
+
+    python -m benchmarks.micro --repeat 5 --output micro.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+from . import workloads
+from domains.roomba.logic import a_star_search
+from domains.gomoku.logic import minimax
+from domains.cat_mouse.models import CatMouseDomain
+from domains.cat_mouse.logic import batched_TD_Q_Learning
+from domains.robot_arm import logic as robot_arm
+
+def measure(func, repeat:int) -> dict:
+    """
+    Call func repeat times after one warm-up call
+    func returns a dict of workload statistics (node counts, iterations, ...), reported from the last call
+    """
+    func()
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stats = func()
+        seconds.append(time.perf_counter() - start)
+    return {
+        "min": min(seconds),
+        "median": statistics.median(seconds),
+        "mean": statistics.mean(seconds),
+        "max": max(seconds),
+        "stats": stats,
+    }
+
+def roomba_case(row, col, max_power, dirty):
+    problem = workloads.roomba_problem(row, col, max_power, dirty)
+    def run():
+        plan, node_count = a_star_search(problem, problem.domain.better_heuristic)
+        return {"plan_length": len(plan), "nodes_popped": node_count}
+    return run
+
+def gomoku_case(board_size, win_size, stones, max_depth):
+    game, state = workloads.gomoku_position(board_size, win_size, stones)
+    def run():
+        stats = {"nodes": 0, "cutoffs": 0}
+        _, utility = minimax(game, state, max_depth, stats=stats)
+        return dict(stats, utility=float(utility))
+    return run
+
+def cat_mouse_case(row, col, num_envs, num_timesteps):
+    game = CatMouseDomain(row, col)
+    def run():
+        _, _, metrics = batched_TD_Q_Learning(game, num_envs, num_timesteps=num_timesteps, seed=workloads.SEED)
+        return {"transitions": len(metrics) * num_envs, "final_max_delta": metrics[-1]["max_delta"]}
+    return run
+
+def robot_arm_case(arms, target, iterations, solver, backend):
+    descend = robot_arm.descend_np if backend == "numpy" else robot_arm.descend_torch
+    def run():
+        _, errors = descend(arms, target, iterations, solver, 1e-4)
+        return {"iterations": len(errors) - 1, "error": float(errors[-1])}
+    return run
+
+def robot_arm_batch_case(arms, grid, extent, iterations, solver, backend):
+    targets = workloads.target_grid(grid, extent)
+    def run():
+        results = robot_arm.solve_ik_batch(arms, targets, iterations, solver, backend=backend)
+        return {
+            "pairs": len(results),
+            "max_iterations": max(r["iterations"] for r in results),
+            "median_error": float(np.median([r["error"] for r in results])),
+        }
+    return run
+
+def render_cases() -> dict:
+    # one full request-equivalent per domain, GIF encoding included
+    from domains.roomba.logic import get_path
+    from domains.cat_mouse.logic import save_animation
+    game = CatMouseDomain(4, 4)
+    _, frames, _ = batched_TD_Q_Learning(game, 64, seed=workloads.SEED)
+    def roomba():
+        np.random.seed(workloads.SEED)
+        return {"gif_bytes": get_path(4, 5, 20).getbuffer().nbytes}
+    def cat_mouse():
+        return {"gif_bytes": save_animation(game, frames).getbuffer().nbytes}
+    def robot_arm_gif():
+        buffer = robot_arm.adjust_robot_arm([5., 4., 3.], [4., 6.], 200, "dls", max_frames=20)
+        return {"gif_bytes": buffer.getbuffer().nbytes}
+    return {"roomba": roomba, "cat_mouse": cat_mouse, "robot_arm": robot_arm_gif}
+
+def cases(groups:list) -> dict:
+    selected = {}
+    if "roomba" in groups:
+        for w in workloads.ROOMBA:
+            selected[f"roomba/a_star/{w['row']}x{w['col']}/p{w['max_power']}"] = roomba_case(**w)
+    if "gomoku" in groups:
+        for w in workloads.GOMOKU:
+            name = f"gomoku/minimax/{w['board_size']}x{w['board_size']}/win{w['win_size']}/stones{w['stones']}/depth{w['max_depth']}"
+            selected[name] = gomoku_case(**w)
+    if "cat_mouse" in groups:
+        for w in workloads.CAT_MOUSE:
+            selected[f"cat_mouse/td/{w['row']}x{w['col']}/envs{w['num_envs']}/t{w['num_timesteps']}"] = cat_mouse_case(**w)
+    if "robot_arm" in groups:
+        for backend in robot_arm.BACKENDS:
+            for w in workloads.ROBOT_ARM:
+                selected[f"robot_arm/ik/{w['solver']}/{backend}/links{len(w['arms'])}"] = robot_arm_case(**w, backend=backend)
+            for w in workloads.ROBOT_ARM_BATCH:
+                name = f"robot_arm/ik_batch/{w['solver']}/{backend}/pairs{len(w['arms']) * w['grid']**2}"
+                selected[name] = robot_arm_batch_case(**w, backend=backend)
+    if "render" in groups:
+        for domain, run in render_cases().items():
+            selected[f"render/{domain}"] = run
+    return selected
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    info = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+    }
+    if robot_arm.tr is not None: info["torch"] = robot_arm.tr.__version__
+    return info
+
+GROUPS = ("roomba", "gomoku", "cat_mouse", "robot_arm", "render")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS[:-1]))
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = {}
+    for name, run in cases(args.groups).items():
+        results[name] = measure(run, args.repeat)
+        print(f"{name}: median {results[name]['median'] * 1000:.1f} ms", file=sys.stderr)
+
+    report = json.dumps({"environment": environment(), "repeat": args.repeat, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f: f.write(report)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
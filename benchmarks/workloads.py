@@ -0,0 +1,65 @@
+import numpy as np
+from domains.roomba.models import RoombaDomain, SearchProblem, CLEAN
+from domains.gomoku.models import GomokuDomain
+
+# Fixed, seeded workloads per domain
+# Keep these unchanged once results have been recorded, so runs stay comparable over time
+SEED = 0
+
+ROOMBA = [
+    {"row": 4, "col": 5, "max_power": 20, "dirty": 5},
+    {"row": 5, "col": 6, "max_power": 20, "dirty": 5},
+    {"row": 6, "col": 7, "max_power": 30, "dirty": 5},
+]
+
+# stones are placed alternately at seeded random cells before searching
+GOMOKU = [
+    {"board_size": 4, "win_size": 3, "stones": 0, "max_depth": 3},
+    {"board_size": 3, "win_size": 3, "stones": 2, "max_depth": -1},
+    {"board_size": 7, "win_size": 5, "stones": 6, "max_depth": 2},
+]
+
+CAT_MOUSE = [
+    {"row": 5, "col": 5, "num_envs": 1, "num_timesteps": 10**4},
+    {"row": 5, "col": 5, "num_envs": 64, "num_timesteps": 10**5},
+    {"row": 8, "col": 8, "num_envs": 256, "num_timesteps": 10**5},
+]
+
+ROBOT_ARM = [
+    {"arms": [5., 4., 3., 2.], "target": [6., 7.], "iterations": 1000, "solver": solver}
+    for solver in ("gd", "dls", "adam")
+]
+
+# arms and a 20x20 grid of targets for the batch solver
+ROBOT_ARM_BATCH = [
+    {"arms": [[5., 4., 3., 2.], [6., 6.]], "grid": 20, "extent": 12., "iterations": 1000, "solver": "dls"},
+]
+
+# HTTP scenarios for the load generator: (method, path, params or JSON body)
+HTTP = {
+    "roomba": ("GET", "/api/roomba/", {"row": 4, "col": 5, "max_power": 20}),
+    "gomoku": ("GET", "/api/gomoku/start", {"board_size": 4, "win_size": 3, "ai_first": True}),
+    "cat_mouse": ("GET", "/api/catmouse/", {"row": 4, "col": 4}),
+    "robot_arm": ("GET", "/api/robotarm/", {"arms": "5,4,3", "target": "4,6", "iterations": 200, "solver": "dls", "max_frames": 20}),
+    "robot_arm_batch": ("POST", "/api/robotarm/batch", {"arms": [[5., 4., 3.]], "targets": [[4., 6.], [1., 1.], [-6., 2.]]}),
+}
+
+def roomba_problem(row:int, col:int, max_power:int, dirty:int) -> SearchProblem:
+    rng = np.random.default_rng(SEED)
+    domain = RoombaDomain(row, col, max_power)
+    clean = list(zip(*np.nonzero(domain.grid == CLEAN)))
+    init = domain.initial_state(roomba_position = (0, 0), dirty_positions = rng.permutation(clean)[:dirty])
+    return SearchProblem(domain, init, domain.is_goal)
+
+def gomoku_position(board_size:int, win_size:int, stones:int) -> tuple[GomokuDomain, np.ndarray]:
+    rng = np.random.default_rng(SEED)
+    game = GomokuDomain(board_size, win_size)
+    state = game.initial_state()
+    cells = rng.permutation(board_size * board_size)[:stones]
+    for cell in cells:
+        state = game.perform(divmod(int(cell), board_size), state)
+    return game, state
+
+def target_grid(grid:int, extent:float) -> list:
+    axis = np.linspace(-extent, extent, grid)
+    return [[float(x), float(y)] for x in axis for y in axis]
\ No newline at end of file
@@ -0,0 +1,141 @@
+import math
+import os
+from .metrics import Counter
+
+# Cost-model admission control
+# Each domain estimates compute seconds and memory before any work starts
+# Requests estimated above DEGRADE_SECONDS have their output quality lowered step by step
+# (fewer frames, smaller figures, shallower search, fewer timesteps) until they fit,
+# and requests still above MAX_SECONDS or MAX_MEMORY_MB are rejected with OverBudget
+MAX_SECONDS = float(os.environ.get("ADMISSION_MAX_SECONDS", 30))
+DEGRADE_SECONDS = float(os.environ.get("ADMISSION_DEGRADE_SECONDS", 10))
+MAX_MEMORY_MB = float(os.environ.get("ADMISSION_MAX_MEMORY_MB", 512))
+
+# Unit costs measured with benchmarks.micro on one core, rounded up
+RENDER_FRAME_SECONDS = 9e-2 # per rendered frame, plus 1e-3 per square inch of figure and 1e-4 per plotted point
+SEARCH_NODE_SECONDS = 5e-5 # per A* node popped, plus 1e-6 per grid cell
+MINIMAX_NODE_SECONDS = 1.5e-4 # per minimax node, plus 1e-6 per board cell
+BOARD_CELL_SECONDS = 2.5e-7 # per gomoku board cell to allocate, decode and serialize the state
+BOARD_CELL_BYTES = 40 # the int board, its int32 copy, the base64 string and the JSON response
+REWARD_STATE_SECONDS = 3e-6 # per cat/mouse state when building the reward array
+TD_STEP_SECONDS = 1.2e-4 # per batched TD step, plus 4e-7 per environment
+ENV_BYTES = 160 # per cat/mouse environment, plus 8 per action for its row of Q
+IK_ITERATION_SECONDS = 1e-3 # per IK iteration of one arm, plus 1e-6 per link
+IK_BATCH_ITERATION_SECONDS = 1e-3 # per batched IK iteration, plus 2.5e-7 per link per (arm, target) pair
+# relative cost of an iteration of each solver, damped least squares may try a second pass of damping levels
+IK_SOLVER_FACTOR = {"gd": 1, "adam": 1, "dls": 2}
+
+ADMISSION_DECISIONS = Counter("admission_decisions_total", "Admission control outcomes", ("domain", "decision"))
+
+class OverBudget(ValueError):
+    pass
+
+def admit(domain:str, estimate, knobs:dict, ladder:list = ()) -> tuple[dict, dict]:
+    """
+    estimate(**knobs) returns {"seconds": ..., "memory_mb": ...} for the given settings
+    ladder lists (knob, value) degradation steps, applied in order while the estimate is above DEGRADE_SECONDS;
+    a step is skipped if the knob is already at or below that value, or if it does not lower the estimate
+    returns (knobs, degraded), where degraded holds only the knobs that were lowered
+    raises OverBudget if the request does not fit even after every step
+    """
+    knobs = dict(knobs)
+    degraded = {}
+    cost = estimate(**knobs)
+    for knob, value in ladder:
+        if cost["seconds"] <= DEGRADE_SECONDS: break
+        if knobs[knob] is not None and knobs[knob] <= value: continue
+        trial = dict(knobs, **{knob: value})
+        trial_cost = estimate(**trial)
+        if trial_cost["seconds"] >= cost["seconds"]: continue
+        knobs, cost = trial, trial_cost
+        degraded[knob] = value
+
+    if cost["seconds"] > MAX_SECONDS or cost["memory_mb"] > MAX_MEMORY_MB:
+        ADMISSION_DECISIONS.inc(domain=domain, decision="rejected")
+        raise OverBudget(
+            f"request too expensive: estimated {cost['seconds']:.1f}s and {cost['memory_mb']:.0f}MB, "
+            f"limits are {MAX_SECONDS:g}s and {MAX_MEMORY_MB:g}MB")
+    ADMISSION_DECISIONS.inc(domain=domain, decision="degraded" if degraded else "admitted")
+    return knobs, degraded
+
+def degraded_header(degraded:dict) -> dict:
+    # response header telling clients which settings were lowered
+    if not degraded: return {}
+    return {"X-Degraded": ", ".join(f"{knob}={value}" for knob, value in degraded.items())}
+
+def render_seconds(frames:int, figsize:float, points:int = 0) -> float:
+    return frames * (RENDER_FRAME_SECONDS + 1e-3 * figsize**2 + 1e-4 * points)
+
+### Per-domain cost estimates
+
+def roomba_cost(row:int, col:int, max_power:int, max_frames:int = None, figsize:float = 8, dirty:int = 5) -> dict:
+    # states are (position, power, subset of dirty cells), about a quarter are popped in practice
+    cells = row * col
+    nodes = 0.25 * cells * (max_power + 1) * 2**dirty
+    frames = 3 * (row + col) + 2 * dirty # rough plan length bound
+    if max_frames is not None: frames = min(frames, max_frames)
+    return {
+        "seconds": nodes * (SEARCH_NODE_SECONDS + 1e-6 * cells) + render_seconds(frames, figsize),
+        # about four nodes are generated per node popped, each holding a copy of the grid
+        "memory_mb": 4 * nodes * (8 * cells + 600) / 2**20,
+    }
+
+ROOMBA_LADDER = [("max_frames", 60), ("figsize", 6), ("max_frames", 30), ("figsize", 4), ("max_frames", 15)]
+
+def gomoku_cost(board_size:int, empty:int, max_depth:int) -> dict:
+    # max_depth = 0 estimates handling the board alone, without a search
+    # alpha-beta visits roughly the 3/4 power of the full game tree
+    depth = empty if max_depth < 0 else min(max_depth, empty)
+    leaves = math.prod(range(empty - depth + 1, empty + 1))
+    nodes = leaves**0.75 if depth else 0
+    cells = board_size**2
+    return {
+        "seconds": nodes * (MINIMAX_NODE_SECONDS + 1e-6 * cells) + cells * BOARD_CELL_SECONDS,
+        # one board copy per level of the search, on top of the request's own state
+        "memory_mb": cells * ((depth + 2) * 8 + BOARD_CELL_BYTES) / 2**20,
+    }
+
+GOMOKU_LADDER = [("max_depth", depth) for depth in (4, 3, 2, 1)]
+
+def cat_mouse_cost(row:int, col:int, num_envs:int, num_timesteps:int = 10**5,
+                   max_frames:int = None, figsize:float = 8, num_actions:int = 9) -> dict:
+    states = (row * col)**2
+    steps = max(1, num_timesteps // num_envs)
+    frames = 10 * (num_timesteps // 30000 + 1) # display windows of 10 frames every 30000 timesteps
+    if max_frames is not None: frames = min(frames, max_frames)
+    return {
+        "seconds": states * REWARD_STATE_SECONDS + steps * (TD_STEP_SECONDS + 4e-7 * num_envs)
+                   + render_seconds(frames, figsize),
+        # Q and choice counts, the reward array and the Python list it is built from,
+        # then the per-environment states, Q rows, targets and unique/bincount temporaries of each batch step
+        "memory_mb": (states * (2 * num_actions * 8 + 8 + 100) + num_envs * (num_actions * 8 + ENV_BYTES)) / 2**20,
+    }
+
+CAT_MOUSE_LADDER = [("max_frames", 20), ("figsize", 6), ("max_frames", 10), ("figsize", 4),
+                    ("num_timesteps", 3 * 10**4), ("num_timesteps", 10**4)]
+# batched_TD_Q_Learning needs num_envs <= num_timesteps, so the cap is the lowest num_timesteps on the ladder
+MAX_NUM_ENVS = 10**4
+
+# Iteration counts are estimated at their cap: the solvers stop early once they converge or stall,
+# but how soon depends on the arm and target (a 100 link arm may use over 10^4 DLS iterations)
+
+def robot_arm_cost(links:int, iterations:int, solver:str, max_frames:int = None, figsize:float = 3) -> dict:
+    frames = iterations + 1 if max_frames is None else min(iterations + 1, max_frames)
+    return {
+        "seconds": iterations * IK_SOLVER_FACTOR.get(solver, 1) * (IK_ITERATION_SECONDS + 1e-6 * links)
+                   + render_seconds(frames, figsize, links + 5),
+        # the forward kinematics of every iteration is kept for rendering
+        "memory_mb": (iterations + 1) * (links + 5) * 3 * 8 * 10 / 2**20,
+    }
+
+ROBOT_ARM_LADDER = [("max_frames", 50), ("figsize", 2), ("max_frames", 20),
+                    ("iterations", 2000), ("iterations", 500), ("iterations", 100)]
+
+def robot_arm_batch_cost(pairs:int, links:int, iterations:int, solver:str) -> dict:
+    return {
+        "seconds": iterations * IK_SOLVER_FACTOR.get(solver, 1) * (IK_BATCH_ITERATION_SECONDS + 2.5e-7 * pairs * links),
+        # about a hundred (pairs, links) temporaries per iteration, and the results list
+        "memory_mb": 96 * pairs * (links + 1) * 8 / 2**20,
+    }
+
+ROBOT_ARM_BATCH_LADDER = [("iterations", 500), ("iterations", 200), ("iterations", 100), ("iterations", 50)]
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from .logic import TD_Q_Learning
-from .models import CatMouseDomain
+from ..loader import load_domain
+from ..admission import admit, degraded_header, OverBudget, cat_mouse_cost, CAT_MOUSE_LADDER, MAX_NUM_ENVS
 from starlette.responses import StreamingResponse
 
 cat_mouse_router = APIRouter(
@@ -9,10 +9,18 @@ cat_mouse_router = APIRouter(
 )
 
 @cat_mouse_router.get("/")
-async def get_animation(row:int, col:int):
+async def get_animation(row:int, col:int, num_envs:int = 64):
     try:
-        game = CatMouseDomain(row, col)
-        buffer = TD_Q_Learning(game)
-        return StreamingResponse(buffer, media_type="image/gif")
+        if not 1 <= num_envs <= MAX_NUM_ENVS: raise ValueError(f"num_envs must be between 1 and {MAX_NUM_ENVS}")
+        knobs, degraded = admit("cat_mouse", cat_mouse_cost,
+                                dict(row=row, col=col, num_envs=num_envs, num_timesteps=10**5, max_frames=None, figsize=8),
+                                CAT_MOUSE_LADDER)
+        logic = load_domain("cat_mouse")
+        game = logic.CatMouseDomain(row, col)
+        _, frames, _ = logic.batched_TD_Q_Learning(game, num_envs, num_timesteps=knobs["num_timesteps"])
+        buffer = logic.save_animation(game, frames, knobs["max_frames"], knobs["figsize"])
+        return StreamingResponse(buffer, media_type="image/gif", headers=degraded_header(degraded))
+    except OverBudget as e:
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
\ No newline at end of file
@@ -3,8 +3,11 @@ from .models import CatMouseDomain
 from matplotlib import animation
 import matplotlib.pyplot as pt
 import tempfile
+import time
 import io
 import os
+from ..metrics import timed, record_phase, GIF_BYTES, TD_STEPS, TD_SECONDS, TD_STEP_RATE
+from ..rendering import decimate
 
 """
 Using TD Q learning when probabilities and optimal utilities are not accessible
@@ -25,7 +28,6 @@ def TD_Q_Learning(game:CatMouseDomain, ɣ = 0.5):
     # Total number of time-steps for learning
     num_timesteps = 10**5
 
-    fig, ax = pt.subplots(figsize=(8, 8))
     frames = []
 
     for t in range(num_timesteps):
@@ -49,6 +51,70 @@ def TD_Q_Learning(game:CatMouseDomain, ɣ = 0.5):
         if False or (t % display_period < display_window):
             frames.append(state)
 
+    return save_animation(game, frames)
+
+def batched_TD_Q_Learning(game:CatMouseDomain, num_envs=64, ɣ = 0.5, num_timesteps=10**5, seed=None):
+    """
+    TD Q learning over num_envs independent environments stepped together
+    The total number of transitions is num_timesteps rounded down to a multiple of num_envs,
+    so num_envs must be between 1 and num_timesteps
+    returns (Q, frames, metrics), where:
+    - Q is the learned (N, K) utility estimate
+    - frames are the states of environment 0 sampled for visualization
+    - metrics[b] holds convergence statistics for batch step b
+    """
+    if not 1 <= num_envs <= num_timesteps:
+        raise ValueError(f"num_envs must be between 1 and num_timesteps ({num_timesteps})")
+    N, K = game.N, game.K
+    rng = np.random.default_rng(seed)
+    Q = np.zeros(N * K) # flattened (state, action) table, index i*K + k
+    choice_counts = np.zeros(N * K)
+    num_steps = num_timesteps // num_envs
+    display_period = max(1, 30000 // num_envs)
+    display_window = 10
+
+    # Spread initial states over the grid for better coverage of the state space
+    upper = np.array([game.grid_cols, game.grid_rows]*2)
+    states = rng.integers(0, upper, size=(num_envs, 4))
+
+    frames = []
+    metrics = []
+    start = time.perf_counter()
+    for t in range(num_steps):
+        i = game.states_to_indices(states)
+        k = rng.integers(K, size=num_envs)
+        states = game.move_batch(states, k, rng)
+        j = game.states_to_indices(states)
+        targets = game.r[i] + ɣ * Q.reshape(N, K)[j].max(axis=1)
+
+        # Several environments may share the same (state, action) pair in one batch
+        # Sequential updates with α = 1/count make Q a running mean of its targets,
+        # so duplicates are folded in together: sum their targets and counts per pair
+        pairs, inverse = np.unique(i * K + k, return_inverse=True)
+        hits = np.bincount(inverse)
+        target_sums = np.bincount(inverse, weights=targets)
+        old_counts = choice_counts[pairs]
+        choice_counts[pairs] = old_counts + hits
+        new_Q = (old_counts * Q[pairs] + target_sums) / choice_counts[pairs]
+        delta = np.fabs(new_Q - Q[pairs])
+        Q[pairs] = new_Q
+
+        metrics.append({"step": t, "max_delta": float(delta.max()), "updated_pairs": int(len(pairs))})
+        if t % display_period < display_window:
+            frames.append(tuple(states[0]))
+    seconds = time.perf_counter() - start
+    record_phase("cat_mouse", "compute", seconds)
+    TD_STEPS.inc(num_steps * num_envs)
+    TD_SECONDS.inc(seconds)
+    TD_STEP_RATE.set(num_steps * num_envs / max(seconds, 1e-9))
+
+    return Q.reshape(N, K), frames, metrics
+
+def save_animation(game:CatMouseDomain, frames:list, max_frames:int = None, figsize:float = 8) -> io.BytesIO:
+    # keep evenly spaced frames if there are more than max_frames
+    frames = [frames[i] for i in decimate(len(frames), max_frames)]
+    fig, ax = pt.subplots(figsize=(figsize, figsize))
+
     def update(frame_idx):
         ax.clear()
         state = frames[frame_idx]
@@ -60,11 +126,13 @@ def TD_Q_Learning(game:CatMouseDomain, ɣ = 0.5):
     with tempfile.NamedTemporaryFile(suffix=".gif", delete=False) as temp_file:
         temp_path = temp_file.name 
     try:
-        anim.save(temp_path, writer="pillow")
+        with timed("cat_mouse", "render"):
+            anim.save(temp_path, writer="pillow")
         buffer = io.BytesIO()
         with open(temp_path, "rb") as f:
             buffer.write(f.read())
         buffer.seek(0) 
+        GIF_BYTES.observe(buffer.getbuffer().nbytes, domain="cat_mouse")
     except Exception as e:
         print(f"Error saving GIF: {e}")
     finally:
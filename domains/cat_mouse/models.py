@@ -66,6 +66,15 @@ class CatMouseDomain:
             state.append(digit)
         return tuple(state)
 
+    def states_to_indices(self, states:np.ndarray) -> np.ndarray:
+        """
+        Vectorized "state_to_index" for a batch of states
+        states[m] = (mx, my, cx, cy) for the m^th environment
+        """
+        factors = [self.grid_cols, self.grid_rows, self.grid_cols, self.grid_rows]
+        coefs = np.cumprod([1] + factors[:-1])
+        return states.astype(np.int64) @ coefs
+
     ### Reward function
     # Uses the distance from the cat as a reward
     # This will make the mouse stay as far as possible from the cat
@@ -94,6 +103,18 @@ class CatMouseDomain:
         cy = min(max(0, cy+cdy), self.grid_rows-1)
         return (mx, my, cx, cy)
 
+    def move_batch(self, states:np.ndarray, action_indices:np.ndarray, rng=np.random) -> np.ndarray:
+        """
+        Vectorized "move" for a batch of states
+        states[m] = (mx, my, cx, cy) and action_indices[m] is the mouse action index for environment m
+        Cat motions are always randomized, one independent draw per environment
+        """
+        mouse_steps = np.asarray(self.actions)[action_indices]
+        cat_steps = rng.choice([-1,0,1], size=mouse_steps.shape)
+        upper = np.array([self.grid_cols-1, self.grid_rows-1]*2)
+        # animals stay at the same place if they try to move past the grid bounds
+        return np.clip(states + np.hstack([mouse_steps, cat_steps]), 0, upper)
+
     def plot_state(self, state):
         """
         state = (mx, my, cx, cy)
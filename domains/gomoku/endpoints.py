@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException
-from .models import GomokuDomain
-from .logic import minimax
+from fastapi import APIRouter, HTTPException, Response
+from ..loader import load_domain
+from ..admission import admit, degraded_header, OverBudget, gomoku_cost, GOMOKU_LADDER
 import numpy as np
 import base64
 import asyncio
@@ -16,6 +16,16 @@ PLAYER_WIN = 1
 AI_WIN = 2
 IN_PROGRESS = 3
 
+MAX_DEPTH = 5 # minimax depth limit, lowered by admission control on large boards
+
+def search_depth(board_size:int, empty:int, response:Response, max_depth:int = MAX_DEPTH) -> int:
+    # admit a search of up to max_depth plies on a board_size board with empty free cells
+    # max_depth = 0 admits handling the board alone, checked before the state is allocated or decoded
+    knobs, degraded = admit("gomoku", gomoku_cost,
+                            dict(board_size=board_size, empty=empty, max_depth=max_depth), GOMOKU_LADDER)
+    response.headers.update(degraded_header(degraded))
+    return knobs["max_depth"]
+
 # serialize numpy.ndarray to base64 string
 def numpy_to_base64(arr: np.ndarray) -> str:
     byte_data = arr.astype(np.int32).tobytes()
@@ -27,23 +37,31 @@ def base64_to_numpy(base64_str: str, shape: tuple, dtype: type = np.int32) -> np
     return np.frombuffer(byte_data, dtype=dtype).reshape(shape)  # Convert bytes back to ndarray
 
 @gomoku_router.get("/start")
-async def start_game(board_size:int, win_size:int, ai_first:bool):
+async def start_game(board_size:int, win_size:int, ai_first:bool, response:Response):
     try:
-        game = GomokuDomain(board_size, win_size)
+        # a game the player starts still needs a search on its first /move, so boards where
+        # not even a depth 1 search fits are rejected here rather than on every move
+        depth = search_depth(board_size, board_size**2, response, MAX_DEPTH if ai_first else 1)
+        logic = load_domain("gomoku")
+        game = logic.GomokuDomain(board_size, win_size)
         state = game.initial_state()
         if ai_first:
             state, _ = await asyncio.wait_for(
-                run_in_threadpool(minimax, game, state, 5),
+                run_in_threadpool(logic.best_move, game, state, depth),
                 timeout=60
             )
         return {"state": numpy_to_base64(state), "status": IN_PROGRESS}
+    except OverBudget as e:
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
 
 @gomoku_router.get("/move")
-async def get_game_state(board_size:int, win_size:int, col:int, row:int, state_str: str):
+async def get_game_state(board_size:int, win_size:int, col:int, row:int, state_str: str, response:Response):
     try:
-        game = GomokuDomain(board_size, win_size)
+        search_depth(board_size, board_size**2, response, 0)
+        logic = load_domain("gomoku")
+        game = logic.GomokuDomain(board_size, win_size)
         state = base64_to_numpy(state_str, shape=(board_size, board_size))
 
         state = game.perform((row, col), state)
@@ -52,8 +70,9 @@ async def get_game_state(board_size:int, win_size:int, col:int, row:int, state_s
                 return {"state": numpy_to_base64(state), "status": TIE}
             return {"state": numpy_to_base64(state), "status": PLAYER_WIN}
         
+        depth = search_depth(board_size, int((state == 0).sum()), response)
         state, _ = await asyncio.wait_for(
-            run_in_threadpool(minimax, game, state, 5),
+            run_in_threadpool(logic.best_move, game, state, depth),
             timeout=60
         )
 
@@ -62,5 +81,7 @@ async def get_game_state(board_size:int, win_size:int, col:int, row:int, state_s
                 return {"state": numpy_to_base64(state), "status": TIE}
             return {"state": numpy_to_base64(state), "status": AI_WIN}
         return {"state": numpy_to_base64(state), "status": IN_PROGRESS}
+    except OverBudget as e:
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
\ No newline at end of file
@@ -1,5 +1,7 @@
 import numpy as np
+import time
 from .models import GomokuDomain
+from ..metrics import record_phase, MINIMAX_NODES, MINIMAX_CUTOFFS, MINIMAX_SECONDS, MINIMAX_NODE_RATE
 
 def simple_evaluator(game, state:np.ndarray):
     # always estimates 0 utility for non-game-over states at the depth limit
@@ -14,18 +16,21 @@ def minimax(game:GomokuDomain,
             max_depth=-1, 
             evaluation_function=simple_evaluator, 
             alpha=-np.inf, 
-            beta=np.inf) -> tuple[np.ndarray, int]:
+            beta=np.inf,
+            stats=None) -> tuple[np.ndarray, int]:
     """
     depth-limited minimax with alpha-beta pruning and evaluation function
     default max_depth = -1 will not impose any depth limit
     default evaluation_function assigns zero to all states
     custom evaluation_function should accept game, state as input and return a number
+    if stats is a dict, its "nodes" and "cutoffs" entries count visited states and alpha-beta cutoffs
     minimax returns (child state, child utility), where:
     - child_state is optimal child
     - child_utility is its utility (also the utility of the parent)
     """
     # default evaluation
     if evaluation_function is None: evaluation_function = (lambda g, s: 0)
+    if stats is not None: stats["nodes"] = stats.get("nodes", 0) + 1
 
     # base cases
     if game.is_over_in(state): return None, game.score_in(state)
@@ -40,7 +45,7 @@ def minimax(game:GomokuDomain,
     curMaxChild, curMaxUtility = None, -np.inf
     for action in game.valid_actions_in(state):
         child_state = game.perform(action, state)
-        _, utility = minimax(game, child_state, max_depth-1, evaluation_function, alpha, beta)
+        _, utility = minimax(game, child_state, max_depth-1, evaluation_function, alpha, beta, stats)
 
         if utility < curMinUtility:
             curMinChild, curMinUtility = child_state, utility
@@ -52,14 +57,29 @@ def minimax(game:GomokuDomain,
             bound = max(bound, utility)
             alpha = max(alpha, bound)
             if utility >= beta:
+                if stats is not None: stats["cutoffs"] = stats.get("cutoffs", 0) + 1
                 break
         else:
             bound = min(bound, utility)
             beta = min(beta, bound)
             if utility <= alpha:
+                if stats is not None: stats["cutoffs"] = stats.get("cutoffs", 0) + 1
                 break
 
     if is_max:
         return curMaxChild, curMaxUtility
     else:
-        return curMinChild, curMinUtility
\ No newline at end of file
+        return curMinChild, curMinUtility
+
+def best_move(game:GomokuDomain, state:np.ndarray, max_depth=-1) -> tuple[np.ndarray, int]:
+    # minimax from state, recording search metrics
+    stats = {"nodes": 0, "cutoffs": 0}
+    start = time.perf_counter()
+    result = minimax(game, state, max_depth, stats=stats)
+    seconds = time.perf_counter() - start
+    record_phase("gomoku", "compute", seconds)
+    MINIMAX_NODES.inc(stats["nodes"])
+    MINIMAX_CUTOFFS.inc(stats["cutoffs"])
+    MINIMAX_SECONDS.inc(seconds)
+    MINIMAX_NODE_RATE.set(stats["nodes"] / max(seconds, 1e-9))
+    return result
\ No newline at end of file
@@ -0,0 +1,50 @@
+import importlib
+import os
+import sys
+import time
+from .metrics import record_phase
+
+# Heavy modules (matplotlib, scipy, torch) are only pulled in by each domain's logic module,
+# so routers can be registered at startup and the logic imported on first use
+DOMAIN_MODULES = {
+    "roomba": "domains.roomba.logic",
+    "gomoku": "domains.gomoku.logic",
+    "cat_mouse": "domains.cat_mouse.logic",
+    "robot_arm": "domains.robot_arm.logic",
+}
+
+# import_report[name] = {"seconds": import time, "rss_mb": resident memory growth}
+# Shared dependencies (numpy, matplotlib) are charged to whichever domain loads them first
+import_report = {}
+
+def resident_memory_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # peak rather than current usage outside Linux, reported in KB (bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def load_domain(name:str):
+    """
+    Import the logic module of domain name on first use and record its cost in import_report
+    returns the module, which is cached by Python after the first call
+    """
+    module_name = DOMAIN_MODULES[name]
+    if name in import_report: return sys.modules[module_name]
+    start, rss = time.perf_counter(), resident_memory_mb()
+    module = importlib.import_module(module_name)
+    import_report[name] = {
+        "seconds": time.perf_counter() - start,
+        "rss_mb": resident_memory_mb() - rss,
+    }
+    record_phase(name, "import", import_report[name]["seconds"])
+    return module
+
+def warm_up(names:list = None) -> dict:
+    # load the given domains (all by default) ahead of their first request
+    for name in names or DOMAIN_MODULES:
+        load_domain(name)
+    return import_report
\ No newline at end of file
@@ -0,0 +1,186 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Minimal in-process metrics rendered in the Prometheus text exposition format
+# Metrics are module-level singletons, updated from request handlers and worker threads
+
+REGISTRY = []
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10., 30., 60.)
+
+def format_labels(labelnames:tuple, values:tuple, extra:str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra: pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_value(value) -> str:
+    # integers are written out in full so large counters keep their precision
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name:str, documentation:str, labelnames:tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def key(self, labels:dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        # yields (suffix, label string, value) for every exported sample
+        for key, value in sorted(self.values.items()):
+            yield "", format_labels(self.labelnames, key), value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            lines += [f"{self.name}{suffix}{labels} {format_value(value)}" for suffix, labels, value in self.samples()]
+        return "\n".join(lines)
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount:float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value:float, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+    def inc(self, amount:float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount:float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name:str, documentation:str, labelnames:tuple = (), buckets:tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value:float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            # values[key] = [per-bucket counts (last one is +Inf), sum]
+            entry = self.values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.])
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def samples(self):
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield "_bucket", format_labels(self.labelnames, key, f'le="{le}"'), cumulative
+            yield "_sum", format_labels(self.labelnames, key), total
+            yield "_count", format_labels(self.labelnames, key), cumulative
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+### HTTP metrics
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route", ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served")
+
+### Phase timing
+# phase_timings holds {phase: seconds} for the current request, reported in the Server-Timing header
+phase_timings = ContextVar("phase_timings", default=None)
+
+PHASE_SECONDS = Histogram("phase_duration_seconds", "Time spent in each phase of a request", ("domain", "phase"))
+
+def record_phase(domain:str, phase:str, seconds:float):
+    """
+    Record seconds spent in one phase of the current request, e.g. "compute" or "render"
+    The duration goes to PHASE_SECONDS and, inside a request, to the Server-Timing header
+    """
+    PHASE_SECONDS.observe(seconds, domain=domain, phase=phase)
+    timings = phase_timings.get()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.) + seconds
+
+@contextmanager
+def timed(domain:str, phase:str):
+    # time a block with record_phase
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(domain, phase, time.perf_counter() - start)
+
+### Domain metrics
+GIF_BYTES = Histogram("gif_bytes", "Size of rendered GIF animations", ("domain",),
+                      buckets=(1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7))
+
+SEARCH_NODES = Counter("roomba_search_nodes_popped_total", "Nodes popped off the frontier by queue_search")
+SEARCH_FRONTIER_PEAK = Histogram("roomba_search_frontier_peak", "Largest frontier size reached by each search",
+                                 buckets=(10, 100, 1e3, 1e4, 1e5, 1e6))
+
+MINIMAX_NODES = Counter("gomoku_minimax_nodes_total", "States visited by minimax")
+MINIMAX_CUTOFFS = Counter("gomoku_minimax_cutoffs_total", "Alpha-beta cutoffs taken by minimax")
+MINIMAX_SECONDS = Counter("gomoku_minimax_seconds_total", "Time spent in minimax searches")
+MINIMAX_NODE_RATE = Gauge("gomoku_minimax_nodes_per_second", "Node rate of the most recent minimax search")
+
+TD_STEPS = Counter("cat_mouse_td_steps_total", "TD Q learning transitions across all environments")
+TD_SECONDS = Counter("cat_mouse_td_seconds_total", "Time spent in TD Q learning")
+TD_STEP_RATE = Gauge("cat_mouse_td_steps_per_second", "Transition rate of the most recent TD Q learning run")
+
+IK_ITERATIONS = Histogram("robot_arm_ik_iterations", "Iterations used per IK solve", ("solver", "backend"),
+                          buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000))
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and in-flight requests,
+    and adding a Server-Timing header with the phases timed during the request
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings = {}
+        token = phase_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                phases = dict(timings, total=time.perf_counter() - start)
+                header = ", ".join(f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in phases.items())
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            phase_timings.reset(token)
+            # label by route template rather than raw path to keep the number of series bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route, status=status)
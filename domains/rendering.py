@@ -0,0 +1,8 @@
+import numpy as np
+
+# Helpers shared by the GIF renderers of each domain
+
+def decimate(n:int, max_frames:int) -> list:
+    # evenly spaced frame indices, always keeping the first and last frame
+    if max_frames is None or n <= max_frames: return list(range(n))
+    return sorted(set(np.linspace(0, n-1, max(max_frames, 2)).round().astype(int).tolist()))
@@ -1,18 +1,66 @@
-from fastapi import APIRouter, HTTPException
-from .logic import adjust_robot_arm
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
+from ..loader import load_domain
+from ..admission import admit, degraded_header, OverBudget
+from ..admission import robot_arm_cost, robot_arm_batch_cost, ROBOT_ARM_LADDER, ROBOT_ARM_BATCH_LADDER
 from starlette.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 robot_arm_router = APIRouter(
     prefix = "/api/robotarm",
     tags = ["robotarm"]
 )
 
+class BatchRequest(BaseModel):
+    # arms[a] lists the link lengths of the a^th arm configuration
+    # targets[k] is the (x, y) position for the gripper to reach
+    arms: list[list[float]]
+    targets: list[tuple[float, float]]
+    iterations: int = 1000
+    solver: str = "dls"
+    tol: float = 1e-4
+    backend: str | None = None # defaults to torch when installed, otherwise numpy
+
 @robot_arm_router.get("/")
-async def get(arms: str, target: str, iterations: int):
+async def get(arms: str, target: str, iterations: int, solver: str = "gd", tol: float = 1e-4, max_frames: int = 100, backend: str | None = None):
     try:
         arms = [float(char.lstrip().rstrip()) for char in arms.split(',')]
         target = [float(char.lstrip().rstrip()) for char in target.split(',')]
-        buffer = adjust_robot_arm(arms, target, iterations)
-        return StreamingResponse(buffer, media_type="image/gif")
+        knobs, degraded = admit("robot_arm", robot_arm_cost,
+                                dict(links=len(arms), iterations=iterations, solver=solver, max_frames=max_frames, figsize=3),
+                                ROBOT_ARM_LADDER)
+        logic = load_domain("robot_arm")
+        buffer = logic.adjust_robot_arm(arms, target, knobs["iterations"], solver, tol, knobs["max_frames"],
+                                        backend or logic.DEFAULT_BACKEND, knobs["figsize"])
+        return StreamingResponse(buffer, media_type="image/gif", headers=degraded_header(degraded))
+    except OverBudget as e:
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
+
+@robot_arm_router.post("/batch")
+async def solve_batch(request: BatchRequest, response: Response):
+    try:
+        if not request.arms or not request.targets or not all(request.arms):
+            raise ValueError("arms and targets must be non-empty")
+        pairs = len(request.arms) * len(request.targets)
+        links = max(len(arm) for arm in request.arms)
+        knobs, degraded = admit("robot_arm", robot_arm_batch_cost,
+                                dict(pairs=pairs, links=links, iterations=request.iterations, solver=request.solver),
+                                ROBOT_ARM_BATCH_LADDER)
+        response.headers.update(degraded_header(degraded))
+        logic = load_domain("robot_arm")
+        results = await run_in_threadpool(
+            logic.solve_ik_batch,
+            request.arms,
+            [list(t) for t in request.targets],
+            knobs["iterations"],
+            request.solver,
+            request.tol,
+            request.backend or logic.DEFAULT_BACKEND
+        )
+        return {"results": results}
+    except OverBudget as e:
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
\ No newline at end of file
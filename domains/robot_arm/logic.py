@@ -1,46 +1,287 @@
-import torch as tr
+import numpy as np
 from .models import * 
+from ..metrics import timed, GIF_BYTES, IK_ITERATIONS
+from ..rendering import decimate
 from matplotlib import animation
 import tempfile
 import io
 import os
 
-def adjust_robot_arm(d:list, t:list, iterations:int):
-    # Start joint angles at zero
-    # Require gradient since joints will be optimized
-    theta = tr.zeros(len(d), requires_grad=True)
+SOLVERS = ("gd", "dls", "adam")
+# torch is optional (see models.py), the NumPy backend needs only the analytic Jacobian
+BACKENDS = ("numpy",) if tr is None else ("torch", "numpy")
+DEFAULT_BACKEND = BACKENDS[0]
+MAX_COORDINATE = 1e6 # larger link lengths or targets overflow the float32 squared error
 
-    # Example target position for gripper in homogenous coordinates
-    target = tr.tensor([[t[0], t[1], 1.]]).t()
-    #target = tr.tensor([[50., 50., 1.]]).t()
+def dls_step(theta, d, target, damping=1.0):
+    """
+    Damped least squares update on the analytic Jacobian
+    delta = J^T (J J^T + damping^2 I)^-1 e, where e is the gripper-to-target error
+    theta may carry leading batch dimensions, with damping shaped (..., 1, 1) to match
+    """
+    arm_points, _ = fwd(theta, d)
+    e = (target - arm_points[..., :2, -1]).unsqueeze(-1)
+    J = jacobian(theta, d)
+    JJt = J @ J.transpose(-1, -2) + damping**2 * tr.eye(2, dtype=theta.dtype)
+    return (J.transpose(-1, -2) @ tr.linalg.solve(JJt, e)).squeeze(-1)
 
-    # Keep track of theta and error during descent
+def dls_step_np(theta, d, target, damping=1.0):
+    # NumPy version of dls_step
+    arm_points, _ = fwd_np(theta, d)
+    e = (target - arm_points[..., :2, -1])[..., None]
+    J = jacobian_np(theta, d)
+    JJt = J @ np.swapaxes(J, -1, -2) + damping**2 * np.eye(2)
+    return (np.swapaxes(J, -1, -2) @ np.linalg.solve(JJt, e))[..., 0]
+
+def check_options(solver:str, backend:str, iterations:int, tol:float):
+    if iterations < 0:
+        raise ValueError(f"iterations must be non-negative, got {iterations}")
+    if not np.isfinite(tol):
+        raise ValueError(f"tol must be finite, got {tol}")
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver}, expected one of {SOLVERS}")
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend}, expected one of {BACKENDS}")
+
+def check_coordinates(name:str, values:list):
+    # link lengths or target coordinates, which become the solver's results and must serialize as JSON
+    values = np.asarray(values, dtype=float)
+    if not (np.isfinite(values) & (np.abs(values) <= MAX_COORDINATE)).all():
+        raise ValueError(f"{name} must be finite and at most {MAX_COORDINATE:g} in magnitude")
+
+def solve_ik_batch(arms:list, targets:list, iterations:int, solver:str = "dls", tol:float = 1e-4, backend:str = DEFAULT_BACKEND) -> list:
+    """
+    Solve IK for every (arm, target) pair at once as one batched theta array
+    Shorter arms are padded with zero-length links, which do not move the gripper
+    Each pair stops updating once it meets the same stopping rules as adjust_robot_arm
+    returns one dict per pair (arm-major order) with the final angles,
+    error (squared distance to target) and the number of iterations it used
+    """
+    check_options(solver, backend, iterations, tol)
+    for arm in arms: check_coordinates("arms", arm)
+    check_coordinates("targets", targets)
+
+    n = max(len(d) for d in arms)
+    d = np.repeat([list(a) + [0.] * (n - len(a)) for a in arms], len(targets), axis=0)
+    target = np.tile(np.asarray(targets, dtype=float), (len(arms), 1))
+    solve = solve_ik_torch if backend == "torch" else solve_ik_np
+    with timed("robot_arm", "compute"):
+        final_theta, final_error, final_iterations = solve(d, target, iterations, solver, tol)[:3]
+    for count in final_iterations:
+        IK_ITERATIONS.observe(count, solver=solver, backend=backend)
+
+    results = []
+    for b in range(len(d)):
+        arm = b // len(targets)
+        results.append({
+            "arm": arm,
+            "target": targets[b % len(targets)],
+            "theta": final_theta[b, :len(arms[arm])].tolist(),
+            "error": float(final_error[b]),
+            "iterations": int(final_iterations[b]),
+        })
+    return results
+
+def solve_ik_torch(d:np.ndarray, target:np.ndarray, iterations:int, solver:str, tol:float, record:bool = False):
+    """
+    Batched IK with torch, d[b] are the link lengths and target[b] the (x, y) target of pair b
+    returns final angles, errors and iteration counts as NumPy arrays
+    if record is set, also returns the angles of every pair at each iteration
+    """
+    d, target = tr.tensor(d, dtype=tr.float32), tr.tensor(target, dtype=tr.float32)
+    B, n = d.shape
+    theta = tr.zeros(B, n, requires_grad=True)
+    damping = tr.ones(B)
+    optimizer = tr.optim.Adam([theta], lr=0.05) if solver == "adam" else None
+
+    def losses(theta, rows=slice(None)):
+        arm_points, _ = fwd(theta, d[rows])
+        return ((arm_points[:, :2, -1] - target[rows])**2).sum(dim=-1)
+
+    done = tr.zeros(B, dtype=tr.bool)
+    improvement = tr.full((B,), float("inf"))
+    prev_loss = tr.full((B,), float("inf"))
+    final_theta = tr.zeros(B, n)
+    final_error = tr.zeros(B)
+    final_iterations = tr.zeros(B, dtype=tr.long)
     history = []
-    errors = []
-    point_history = []
 
-    # Visualize IK
-    # 500 iterations of gradient descent
-    # "loss" is squared distance between gripper and target
-    # taking gradient of loss w.r.t joint angles
-    for t in range(iterations):
-        # Save current angles in history
-        history.append(theta.clone().detach().numpy())
+    for t in range(iterations + 1):
+        if record: history.append(theta.detach().clone())
+        loss = losses(theta)
+        with tr.no_grad():
+            if solver != "dls":
+                improvement, prev_loss = prev_loss - loss, loss.clone()
+            # pairs that converged, stalled or ran out of iterations keep their current result
+            stop = (loss < tol) | ((improvement >= 0) & (improvement < tol * 1e-3))
+            if t == iterations: stop[:] = True
+            stop &= ~done
+            final_theta[stop] = theta[stop]
+            final_error[stop] = loss[stop]
+            final_iterations[stop] = t
+            done |= stop
+        if done.all(): break
+        active = (~done).unsqueeze(-1)
+
+        if solver == "dls":
+            with tr.no_grad():
+                # a pair whose step does not reduce the loss is retried with damping * 4, * 16, ... up to 1e6
+                # within the same iteration: every larger damping is tried at once, keeping the first that helps
+                rows = (~done).nonzero().squeeze(-1)
+                for scale in (tr.ones(1), 4.0**tr.arange(1, 15)):
+                    if not len(rows): break
+                    levels = damping[rows, None] * scale
+                    r = rows.repeat_interleave(len(scale))
+                    step = dls_step(theta[r], d[r], target[r], levels.reshape(-1, 1, 1)).reshape(len(rows), len(scale), n)
+                    new_loss = losses(theta[r] + step.reshape(-1, n), r).reshape(len(rows), len(scale))
+                    ok = (new_loss < loss[rows, None]) & (levels <= 1e6)
+                    accept, first = ok.any(dim=1), ok.int().argmax(dim=1)
+                    a, f = rows[accept], first[accept]
+                    theta[a] += step[accept, f]
+                    improvement[a] = loss[a] - new_loss[accept, f]
+                    damping[a] = (levels[accept, f] / 2).clamp(min=1e-3)
+                    rows = rows[~accept]
+                # no step reduces the loss of these pairs any further, they are at a (local) optimum
+                final_theta[rows] = theta[rows]
+                final_error[rows] = loss[rows]
+                final_iterations[rows] = t
+                done[rows] = True
+            if done.all(): break
+        elif solver == "adam":
+            optimizer.zero_grad()
+            loss.sum().backward()
+            theta.grad *= active
+            optimizer.step()
+        else:
+            loss.sum().backward()
+            with tr.no_grad():
+                theta -= 0.004 * theta.grad * active
+            theta.grad *= 0
+
+    return final_theta.numpy(), final_error.numpy(), final_iterations.numpy(), history
+
+def solve_ik_np(d:np.ndarray, target:np.ndarray, iterations:int, solver:str, tol:float, record:bool = False):
+    """
+    NumPy version of solve_ik_torch, using the analytic gradient 2 J^T (p - target) in place of autograd
+    if record is set, also returns the angles of every pair at each iteration
+    """
+    B, n = d.shape
+    theta = np.zeros((B, n))
+    damping = np.ones(B)
+    m, v = np.zeros((B, n)), np.zeros((B, n)) # Adam moment estimates, same defaults as torch
+    beta1, beta2, lr = 0.9, 0.999, 0.05
+
+    def losses(theta, rows=slice(None)):
+        arm_points, _ = fwd_np(theta, d[rows])
+        return ((arm_points[:, :2, -1] - target[rows])**2).sum(axis=-1)
+
+    done = np.zeros(B, dtype=bool)
+    improvement = np.full(B, np.inf)
+    prev_loss = np.full(B, np.inf)
+    final_theta = np.zeros((B, n))
+    final_error = np.zeros(B)
+    final_iterations = np.zeros(B, dtype=int)
+    history = []
+
+    for t in range(iterations + 1):
+        if record: history.append(theta.copy())
+        loss = losses(theta)
+        if solver != "dls":
+            improvement, prev_loss = prev_loss - loss, loss
+        # pairs that converged, stalled or ran out of iterations keep their current result
+        stop = (loss < tol) | ((improvement >= 0) & (improvement < tol * 1e-3))
+        if t == iterations: stop[:] = True
+        stop &= ~done
+        final_theta[stop] = theta[stop]
+        final_error[stop] = loss[stop]
+        final_iterations[stop] = t
+        done |= stop
+        if done.all(): break
+        active = (~done)[:, None]
+
+        if solver == "dls":
+            # retries with more damping as in solve_ik_torch
+            rows = np.nonzero(~done)[0]
+            for scale in (np.ones(1), 4.0**np.arange(1, 15)):
+                if not len(rows): break
+                levels = damping[rows, None] * scale
+                r = np.repeat(rows, len(scale))
+                step = dls_step_np(theta[r], d[r], target[r], levels.reshape(-1, 1, 1)).reshape(len(rows), len(scale), n)
+                new_loss = losses(theta[r] + step.reshape(-1, n), r).reshape(len(rows), len(scale))
+                ok = (new_loss < loss[rows, None]) & (levels <= 1e6)
+                accept, first = ok.any(axis=1), ok.argmax(axis=1)
+                a, f = rows[accept], first[accept]
+                theta[a] += step[accept, f]
+                improvement[a] = loss[a] - new_loss[accept, f]
+                damping[a] = np.maximum(levels[accept, f] / 2, 1e-3)
+                rows = rows[~accept]
+            # no step reduces the loss of these pairs any further, they are at a (local) optimum
+            final_theta[rows] = theta[rows]
+            final_error[rows] = loss[rows]
+            final_iterations[rows] = t
+            done[rows] = True
+            if done.all(): break
+            continue
+
+        arm_points, _ = fwd_np(theta, d)
+        e = arm_points[:, :2, -1] - target
+        grad = 2 * (np.swapaxes(jacobian_np(theta, d), -1, -2) @ e[..., None])[..., 0] * active
+        if solver == "adam":
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad**2
+            m_hat, v_hat = m / (1 - beta1**(t+1)), v / (1 - beta2**(t+1))
+            theta -= lr * m_hat / (np.sqrt(v_hat) + 1e-8)
+        else:
+            theta -= 0.004 * grad
+
+    return final_theta, final_error, final_iterations, history
+
+def descend_torch(d:list, t:list, iterations:int, solver:str, tol:float):
+    # returns the (arm_points, grip_points) of every iteration and the matching losses
+    # driven by solve_ik_torch on a batch of one
+    target = tr.tensor([t[:2]], dtype=tr.float32)
+    _, _, _, history = solve_ik_torch(np.array([d], dtype=float), target.numpy(), iterations, solver, tol, record=True)
+    arm_points, grip_points = fwd(tr.cat(history), d)
+    errors = ((arm_points[:, :2, -1] - target)**2).sum(dim=-1).tolist()
+    return list(zip(arm_points, grip_points)), errors
 
-        # Forward kinematics for current arm position
-        arm_points, grip_points = fwd(theta, d)
-        point_history.append( (arm_points, grip_points) )
+def descend_np(d:list, t:list, iterations:int, solver:str, tol:float):
+    # NumPy version of descend_torch
+    target = np.array([t[:2]], dtype=float)
+    _, _, _, history = solve_ik_np(np.array([d], dtype=float), target, iterations, solver, tol, record=True)
+    arm_points, grip_points = fwd_np(np.concatenate(history), d)
+    errors = ((arm_points[:, :2, -1] - target)**2).sum(axis=-1).tolist()
+    return list(zip(arm_points, grip_points)), errors
 
-        # Gradient descent
-        loss = ((arm_points[:,[-1]] - target)**2).sum()
-        loss.backward()
-        theta.data -= 0.004 * theta.grad # scale by learning rate
-        theta.grad *= 0 # zero-out for next backward call
+def adjust_robot_arm(d:list, t:list, iterations:int, solver:str = "gd", tol:float = 1e-4, max_frames:int = None, backend:str = DEFAULT_BACKEND, figsize:float = 3):
+    """
+    solver is one of SOLVERS:
+    - "gd" is fixed-rate gradient descent (learning rate 0.004)
+    - "dls" is damped least squares on the analytic Jacobian, with Levenberg-Marquardt damping:
+      steps that do not reduce the loss are retried with more damping,
+      and the search stops once the damping grows too large to make progress
+    - "adam" is the Adam optimizer on the same loss
+    backend is one of BACKENDS, "numpy" runs the same solvers without torch
+    Optimization stops early once the loss drops below tol, or once it improves by less than tol/1000 in a step
+    max_frames caps the number of rendered frames by evenly decimating the history
+    figsize is the width and height of the rendered figure in inches
+    """
+    check_options(solver, backend, iterations, tol)
+    check_coordinates("arms", d)
+    check_coordinates("target", t)
 
-        errors.append(loss.item())
+    with timed("robot_arm", "compute"):
+        if backend == "numpy":
+            point_history, errors = descend_np(d, t, iterations, solver, tol)
+        else:
+            point_history, errors = descend_torch(d, t, iterations, solver, tol)
+    IK_ITERATIONS.observe(len(errors) - 1, solver=solver, backend=backend)
+    target = np.array([[t[0], t[1], 1.]]).T
+    frames = decimate(len(point_history), max_frames)
 
     # animate the state sequence
     def drawframe(n):
+        n = frames[n]
         arm_points, grip_points = point_history[n]
         pt.cla()
         pt.plot(target[0,0], target[1,0], 'ro')
@@ -48,17 +289,19 @@ def adjust_robot_arm(d:list, t:list, iterations:int):
         pt.title("iter %d: loss = %f" % (n, errors[n]))
 
     # blit=True re-draws only the parts that have changed.
-    fig = pt.figure(figsize=(3,3)) # each time-step is rendered on this figure
-    anim = animation.FuncAnimation(fig, drawframe, frames=len(point_history), interval=500, blit=False)
+    fig = pt.figure(figsize=(figsize,figsize)) # each time-step is rendered on this figure
+    anim = animation.FuncAnimation(fig, drawframe, frames=len(frames), interval=500, blit=False)
 
     with tempfile.NamedTemporaryFile(suffix=".gif", delete=False) as temp_file:
         temp_path = temp_file.name 
     try:
-        anim.save(temp_path, writer="pillow")
+        with timed("robot_arm", "render"):
+            anim.save(temp_path, writer="pillow")
         buffer = io.BytesIO()
         with open(temp_path, "rb") as f:
             buffer.write(f.read())
         buffer.seek(0) 
+        GIF_BYTES.observe(buffer.getbuffer().nbytes, domain="robot_arm")
     except Exception as e:
         print(f"Error saving GIF: {e}")
     finally:
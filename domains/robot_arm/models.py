@@ -1,10 +1,17 @@
 import matplotlib.pyplot as pt
-import torch as tr
+import numpy as np
+
+# torch is optional: without it only the NumPy functions (fwd_np, jacobian_np) are usable
+try:
+    import torch as tr
+except ImportError:
+    tr = None
 
 # Visualize the current arm/gripper position
 def viz(arm_points, grip_points, d):
-    arm_points = arm_points.detach() # for matplotlib
-    grip_points = grip_points.detach() # for matplotlib
+    if hasattr(arm_points, "detach"):
+        arm_points = arm_points.detach() # for matplotlib
+        grip_points = grip_points.detach() # for matplotlib
     # arm_points[0,j], arm_points[1,j] are (x,y) coordinates for joint j
     # similarly the points delineating the gripper
     pt.plot(arm_points[0,:], arm_points[1,:], '-ko')
@@ -12,60 +19,74 @@ def viz(arm_points, grip_points, d):
     pt.xlim([-sum(d), sum(d)])
     pt.ylim([-sum(d), sum(d)])
 
-# Get transformation matrices for position/orientation of each joint
-# In transformation matrix M, M[:2,:2] is the rotation and M[:2,3] is the translation
-def get_transforms(theta, d):
-    # theta[j] is angle for joint j (tr.tensor)
-    # d[j] is the length of the link connected to joint j (np.array)
-    # theta is tr.tensor so that IK can use gradient descent
-
-    # to avoid writing out sin/cos a lot
-    s = tr.sin(theta)
-    c = tr.cos(theta)
-
-    # First transformation (base link) is at the origin, so identity matrix
-    # 3x3 for homogenous coordinates
-    transforms = [tr.eye(3)]
+# Gripper knuckles and tips in the frame of the last joint
+GRIP_OFFSETS = [
+    [1.,  1.], # left fingertip
+    [0.,  1.], # left knuckle
+    [0., -1.], # right knuckle
+    [1., -1.], # right fingertip
+]
 
-    # Construct remaining transformations for each joint
-    for j in range(len(theta)):
+# Forward kinematics: positions of each joint/gripper in closed form
+# For a planar chain, link j points along the cumulative angle phi[j] = theta[0] + ... + theta[j],
+# so joint j+1 sits at joint j + d[j] * (cos(phi[j]), sin(phi[j]))
+# This matches chaining per-joint rotation and translation matrices without building any of them
+# theta may carry leading batch dimensions: theta[..., j] is the angle for joint j
+# returns homogenous coordinates arm_points[..., :, j] and grip_points[..., :, k]
+def fwd(theta, d):
+    d = tr.as_tensor(d, dtype=theta.dtype)
+    phi = tr.cumsum(theta, dim=-1)
+    c, s = tr.cos(phi), tr.sin(phi)
+    zero = tr.zeros(theta.shape[:-1] + (1,), dtype=theta.dtype)
+    x = tr.cat([zero, tr.cumsum(d * c, dim=-1)], dim=-1)
+    y = tr.cat([zero, tr.cumsum(d * s, dim=-1)], dim=-1)
+    arm_points = tr.stack([x, y, tr.ones_like(x)], dim=-2)
 
-        # Translation matrix
-        T = tr.tensor([
-            [1., 0., d[j]],
-            [0., 1., 0.  ],
-            [0., 0., 1.  ]])
-        # Rotation matrix
-        R = tr.eye(3)
-        R[0,0] =  c[j]
-        R[0,1] = -s[j]
-        R[1,0] =  s[j]
-        R[1,1] =  c[j]
-        # Compose rotation and translation for current joint relative to previous joint
-        M = tr.mm(R, T)
+    # Rotate gripper offsets by the final angle and translate to the last joint
+    g = tr.tensor(GRIP_OFFSETS, dtype=theta.dtype).t()
+    c, s = c[..., -1:], s[..., -1:]
+    gx = x[..., -1:] + c * g[0] - s * g[1]
+    gy = y[..., -1:] + s * g[0] + c * g[1]
+    grip_points = tr.stack([gx, gy, tr.ones_like(gx)], dim=-2)
 
-        # Compose with transforms from previous joints to get relative to origin
-        transforms.append(tr.mm(transforms[j], M))
+    return arm_points, grip_points
 
-    return transforms
+# NumPy version of fwd with the same shapes, for callers that do not need gradients
+def fwd_np(theta, d):
+    theta = np.asarray(theta, dtype=float)
+    phi = np.cumsum(theta, axis=-1)
+    c, s = np.cos(phi), np.sin(phi)
+    zero = np.zeros(theta.shape[:-1] + (1,))
+    x = np.concatenate([zero, np.cumsum(np.asarray(d) * c, axis=-1)], axis=-1)
+    y = np.concatenate([zero, np.cumsum(np.asarray(d) * s, axis=-1)], axis=-1)
+    arm_points = np.stack([x, y, np.ones_like(x)], axis=-2)
 
-# Forward kinematics: use transforms to get positions of each joint/gripper
-def fwd(theta, d):
-    # Get transforms for current joints
-    transforms = get_transforms(theta, d)
+    g = np.array(GRIP_OFFSETS).T
+    c, s = c[..., -1:], s[..., -1:]
+    gx = x[..., -1:] + c * g[0] - s * g[1]
+    gy = y[..., -1:] + s * g[0] + c * g[1]
+    grip_points = np.stack([gx, gy, np.ones_like(gx)], axis=-2)
 
-    # Extract coordinates of each joint
-    # arm_points[:,j] is cartesian position of j^th joint
-    origin = tr.tensor([[0., 0., 1.]]).t()
-    arm_points = tr.cat([tr.mm(M, origin) for M in transforms], dim=1)
+    return arm_points, grip_points
 
-    # Extract points at gripper knuckles and tips
-    grip_points = tr.tensor([
-        [1.,  1., 1.], # left fingertip
-        [0.,  1., 1.], # left knuckle
-        [0., -1., 1.], # right knuckle
-        [1., -1., 1.], # right fingertip
-    ]).t()
-    grip_points = tr.mm(transforms[-1], grip_points)
+# Analytic Jacobian of the gripper position w.r.t. the joint angles
+# Joint j rotates every link after it, so column j is the sum over links i >= j
+# of d[i] * (-sin(phi[i]), cos(phi[i])), i.e. a reverse cumulative sum
+# returns J[..., :, j] = d(x, y)/d(theta[j])
+def jacobian(theta, d):
+    d = tr.as_tensor(d, dtype=theta.dtype)
+    phi = tr.cumsum(theta, dim=-1)
+    dx = -d * tr.sin(phi)
+    dy = d * tr.cos(phi)
+    dx = dx.flip(-1).cumsum(-1).flip(-1)
+    dy = dy.flip(-1).cumsum(-1).flip(-1)
+    return tr.stack([dx, dy], dim=-2)
 
-    return arm_points, grip_points
\ No newline at end of file
+# NumPy version of jacobian with the same shapes
+def jacobian_np(theta, d):
+    phi = np.cumsum(np.asarray(theta, dtype=float), axis=-1)
+    dx = -np.asarray(d) * np.sin(phi)
+    dy = np.asarray(d) * np.cos(phi)
+    dx = np.flip(np.flip(dx, -1).cumsum(-1), -1)
+    dy = np.flip(np.flip(dy, -1).cumsum(-1), -1)
+    return np.stack([dx, dy], axis=-2)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from .logic import get_path
+from ..loader import load_domain
+from ..admission import admit, degraded_header, OverBudget, roomba_cost, ROOMBA_LADDER
 from starlette.responses import StreamingResponse
 
 roomba_router = APIRouter(
@@ -10,7 +11,12 @@ roomba_router = APIRouter(
 @roomba_router.get("/")
 async def get_animation(row:int, col:int, max_power:int):
     try:
-        buffer = get_path(row, col, max_power)
-        return StreamingResponse(buffer, media_type="image/gif")
+        knobs, degraded = admit("roomba", roomba_cost,
+                                dict(row=row, col=col, max_power=max_power, max_frames=None, figsize=8), ROOMBA_LADDER)
+        logic = load_domain("roomba")
+        buffer = logic.get_path(row, col, max_power, knobs["max_frames"], knobs["figsize"])
+        return StreamingResponse(buffer, media_type="image/gif", headers=degraded_header(degraded))
+    except OverBudget as e:
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
\ No newline at end of file
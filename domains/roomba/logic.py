@@ -1,5 +1,7 @@
 from .models import FIFOFrontier, PriorityHeapFIFOFrontier
 from .models import RoombaDomain, SearchProblem, CLEAN
+from ..metrics import timed, GIF_BYTES, SEARCH_NODES, SEARCH_FRONTIER_PEAK
+from ..rendering import decimate
 import matplotlib.pyplot as pt
 from matplotlib import animation
 import numpy as np
@@ -11,6 +13,7 @@ def queue_search(frontier, problem):
     # Update implementation to also return node count
     # This is the total number of nodes popped off the frontier during the search
     count = 0
+    peak = 0 # largest frontier size during the search
     explored = set()
     root = problem.root_node()
     frontier.push(root)
@@ -22,7 +25,10 @@ def queue_search(frontier, problem):
         for child in node.children():
             if child.state in explored: continue
             frontier.push(child)
+        peak = max(peak, len(frontier))
     plan = node.path() if node.is_goal() else []
+    SEARCH_NODES.inc(count)
+    SEARCH_FRONTIER_PEAK.observe(peak)
     # Second return value should be node count, not 0
     return plan, count
 
@@ -33,7 +39,7 @@ def a_star_search(problem, heuristic):
     problem.heuristic = heuristic
     return queue_search(PriorityHeapFIFOFrontier(), problem)
 
-def get_path(row:int, col:int, max_power:int):
+def get_path(row:int, col:int, max_power:int, max_frames:int = None, figsize:float = 8):
     # set up initial state by making five random open positions dirty
     domain = RoombaDomain(row, col, max_power)
     init = domain.initial_state(
@@ -41,14 +47,17 @@ def get_path(row:int, col:int, max_power:int):
         dirty_positions = np.random.permutation(list(zip(*np.nonzero(domain.grid == CLEAN))))[:5])
 
     problem = SearchProblem(domain, init, domain.is_goal)
-    plan, node_count = a_star_search(problem, domain.better_heuristic)
+    with timed("roomba", "compute"):
+        plan, node_count = a_star_search(problem, domain.better_heuristic)
 
     # reconstruct the intermediate states along the plan
     states = [ problem.initial_state]
     for a in range(len(plan)):
         states.append(domain.perform_action(states[-1], plan[a]))
+    # keep evenly spaced states, including the first and the goal, if there are too many to render
+    states = [states[i] for i in decimate(len(states), max_frames)]
 
-    fig = pt.figure(figsize=(8,8))
+    fig = pt.figure(figsize=(figsize,figsize))
     def drawframe(n):
         pt.cla()
         domain.render(pt.gca(), states[n])
@@ -57,12 +66,14 @@ def get_path(row:int, col:int, max_power:int):
     with tempfile.NamedTemporaryFile(suffix=".gif", delete=False) as temp_file:
         temp_path = temp_file.name  # Store the file path
     try:
-        anim.save(temp_path, writer="pillow")  # Save as GIF
+        with timed("roomba", "render"):
+            anim.save(temp_path, writer="pillow")  # Save as GIF
         # Read file into BytesIO
         buffer = io.BytesIO()
         with open(temp_path, "rb") as f:
             buffer.write(f.read())
         buffer.seek(0)  # Reset buffer for reading
+        GIF_BYTES.observe(buffer.getbuffer().nbytes, domain="roomba")
     except Exception as e:
         print(f"Error saving GIF: {e}")
     finally:
@@ -194,6 +194,9 @@ class PriorityHeapFIFOFrontier(object):
                 self.state_lookup.pop(node.state)
                 return node
 
+    def __len__(self):
+        return len(self.state_lookup)
+
     def is_not_empty(self):
         return len(self.heap) > 0
 
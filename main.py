@@ -1,11 +1,34 @@
+import time
+IMPORT_START = time.perf_counter() # startup time is measured from here
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from domains.roomba.endpoints import roomba_router
 from domains.gomoku.endpoints import gomoku_router
 from domains.cat_mouse.endpoints import cat_mouse_router
 from domains.robot_arm.endpoints import robot_arm_router
+from domains.loader import import_report, resident_memory_mb, warm_up
+from domains.metrics import MetricsMiddleware, render
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+# startup_report["import_seconds"] covers importing main and the routers,
+# "seconds" also includes the warm-up, and "rss_mb" is resident memory once startup is done
+startup_report = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # WARM_UP_DOMAINS="all" or a comma separated list such as "roomba,gomoku"
+    # loads those domains at startup instead of on their first request
+    domains = os.environ.get("WARM_UP_DOMAINS", "").strip()
+    if domains:
+        warm_up(None if domains == "all" else [name.strip() for name in domains.split(",")])
+    startup_report["seconds"] = time.perf_counter() - IMPORT_START
+    startup_report["rss_mb"] = resident_memory_mb()
+    yield
 
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Game Hub API",
     description="API for managing multiple game domains",
     version="1.0.0"
@@ -19,12 +42,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all HTTP methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["Server-Timing", "X-Degraded"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(roomba_router)
 app.include_router(gomoku_router)
 app.include_router(cat_mouse_router)
 app.include_router(robot_arm_router)
+startup_report["import_seconds"] = time.perf_counter() - IMPORT_START
+
+@app.get("/import-report")
+def get_import_report():
+    # per-domain import time and resident memory growth, for domains loaded so far
+    return {"startup": startup_report, "domains": import_report, "rss_mb": resident_memory_mb()}
+
+@app.get("/metrics")
+def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def welcome():